@@ -17,32 +17,39 @@ Date: Septembre 2025
 """
 
 import os
-import json
+import sys
+import hashlib
+import argparse
 import logging
 import asyncio
 import time
 import random
+import queue
+import threading
+import mmap
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+from collections import Counter, deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-# Imports pour le traitement d'images et PDF
+# Imports réseau (toujours utilisés)
 import requests
-import base64
-from PIL import Image, ImageDraw, ImageFont
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from io import BytesIO
 import tempfile
 
-# Imports pour la génération PDF
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.colors import black, white
-
-# Imports pour le progress tracking
-from tqdm import tqdm
+# PIL, reportlab et tqdm sont importés à la première utilisation (traitement d'images, PDF,
+# barres de progression) pour garder un démarrage rapide
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
 
 # Variables d'environnement
 from dotenv import load_dotenv
@@ -59,17 +66,142 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Polices standard des PDFs: métriques chargées une fois par processus, pas au premier setFont de chaque PDF
+PDF_FONTS = ("Helvetica", "Helvetica-Bold")
+
+# Prompts courts et précis, par catégorie et par zone
+BASE_DESCRIPTIONS = {
+    "menagers": "household garbage waste",
+    "recyclables": "recyclable waste material",
+    "dangereux": "hazardous waste container"
+}
+
+ZONE_CONTEXTS = {
+    "residentielle": "home",
+    "commerciale": "office",
+    "industrielle": "factory"
+}
+
+def _prompt_suffix(category: str, zone: str) -> str:
+    """Partie du prompt commune à tous les déchets d'une même catégorie/zone"""
+    base = BASE_DESCRIPTIONS.get(category, "waste")
+    context = ZONE_CONTEXTS.get(zone, "")
+    return f"{base} from {context}, used dirty refuse, white background"
+
+# Suffixes précalculés une fois pour chaque couple (catégorie, zone)
+_PROMPT_SUFFIXES = {
+    (category, zone): _prompt_suffix(category, zone)
+    for category in BASE_DESCRIPTIONS
+    for zone in ZONE_CONTEXTS
+}
+
+@lru_cache(maxsize=256)
+def _build_prompt_cached(name: str, category: str, zone: str) -> str:
+    """Prompt final court, mémorisé: les retries et relances ne le reconstruisent pas"""
+    suffix = _PROMPT_SUFFIXES.get((category, zone))
+    if suffix is None:
+        suffix = _prompt_suffix(category, zone)
+    return " ".join(("realistic", name.replace('_', ' '), suffix))
+
+@dataclass(slots=True, frozen=True)
 class CompetitionWasteItem:
     """Configuration d'un déchet pour la compétition"""
     name: str
     category: str  # "menagers", "dangereux", "recyclables"
     zone: str     # "residentielle", "commerciale", "industrielle"
     description: str
-    colors: List[str]
-    materials: List[str]
-    typical_forms: List[str]
+    colors: Tuple[str, ...]
+    materials: Tuple[str, ...]
+    typical_forms: Tuple[str, ...]
+    cache_key: str = field(init=False)  # "catégorie_zone_nom", clé du cache et des fichiers images
     
+    def __post_init__(self):
+        # Instance figée: l'attribut dérivé est posé une seule fois à la construction
+        object.__setattr__(self, "cache_key", f"{self.category}_{self.zone}_{self.name}")
+    
+# Configuration des déchets (données), lue une seule fois par processus
+WASTE_ITEMS_FILE = Path(__file__).with_name("waste_items.json")
+_WASTE_ITEMS_DATA: Optional[Tuple[dict, ...]] = None
+_WASTE_SEQUENCE_FIELDS = ("colors", "materials", "typical_forms")
+
+# Catégories internées: les chaînes lues dans le JSON sont alors les mêmes objets que
+# les clés des dictionnaires de comptage, la recherche se résout par comparaison de pointeurs
+WASTE_CATEGORIES = tuple(sys.intern(category) for category in ("menagers", "recyclables", "dangereux"))
+
+def _load_waste_items_data() -> Tuple[dict, ...]:
+    """Entrées de waste_items.json, parsées au premier appel puis mises en cache; les listes
+    deviennent des tuples immuables, partagés sans risque par tous les items construits"""
+    global _WASTE_ITEMS_DATA
+    if _WASTE_ITEMS_DATA is None:
+        entries = orjson.loads(WASTE_ITEMS_FILE.read_bytes())
+        for entry in entries:
+            entry["category"] = sys.intern(entry["category"])
+            entry["zone"] = sys.intern(entry["zone"])
+            for field_name in _WASTE_SEQUENCE_FIELDS:
+                entry[field_name] = tuple(entry[field_name])
+        _WASTE_ITEMS_DATA = tuple(entries)
+    return _WASTE_ITEMS_DATA
+
+# Requête d'origine: les images cache/<clé>.jpg des versions précédentes ont été générées avec
+# ces paramètres et ces prompts (empreinte de _build_prompt_cached pour chaque catégorie/zone)
+_LEGACY_GENERATION_PARAMETERS = {"model": "seedream", "aspect_ratio": "square_1_1", "guidance_scale": 3.0}
+_LEGACY_PROMPTS_DIGEST = "b97fd9257307a00b"
+
+def _prompt_templates_digest() -> str:
+    """Empreinte des gabarits de prompt (préfixe, description, contexte de zone) de chaque catégorie/zone"""
+    prompts = [_build_prompt_cached("_", category, zone) for category, zone in sorted(_PROMPT_SUFFIXES)]
+    return hashlib.blake2b("\n".join(prompts).encode("utf-8"), digest_size=8).hexdigest()
+
+# Image brute: octets en mémoire (fraîchement téléchargée) ou chemin d'un fichier du cache disque
+ImageSource = Union[bytes, Path]
+
+def _write_file_atomic(path: Path, data: bytes):
+    """Écrit un fichier de façon atomique (fichier temporaire voisin puis os.replace): un run
+    interrompu ne laisse jamais de fichier tronqué sous le nom final"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+def _is_complete_jpeg(path: Path) -> bool:
+    """Vrai si le fichier existe et se termine par le marqueur de fin JPEG (EOI)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(-2, os.SEEK_END)
+            return f.read(2) == b"\xff\xd9"
+    except OSError:
+        # Absent, ou trop court pour contenir le marqueur
+        return False
+
+class TokenBucket:
+    """Limiteur de débit par jeton (thread-safe): lisse les appels pour éviter les 429"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._condition = threading.Condition()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+    
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible puis le consomme"""
+        with self._condition:
+            self._refill()
+            while self._tokens < 1:
+                self._condition.wait((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
 class FreepikImageGenerator:
     """Générateur d'images via l'API Freepik avec utilisation simultanée des clés"""
     
@@ -81,14 +213,82 @@ class FreepikImageGenerator:
             raise ValueError("Aucune clé API Freepik configurée")
         
         self.api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
+        self.model = "seedream"
         self.max_retries = 2
         self.base_delay = 2.0
         
-        # Statistiques par clé pour monitoring
+        # Paramètres de génération fixes: seul le prompt varie d'une requête à l'autre
+        self._payload_template = {
+            "aspect_ratio": "square_1_1",
+            "guidance_scale": 3.0,
+        }
+        
+        # Requêtes identiques à celles du code d'origine: les images du cache d'avant restent valides
+        self.uses_legacy_requests = (
+            {**self._payload_template, "model": self.model} == _LEGACY_GENERATION_PARAMETERS
+            and _prompt_templates_digest() == _LEGACY_PROMPTS_DIGEST
+        )
+        
+        # Polling du statut: démarre vite puis ralentit jusqu'au plafond
+        self.poll_initial_interval = 1.0
+        self.poll_max_interval = 6.0
+        self.poll_jitter = 0.3
+        
+        # Nombre de générations en vol autorisées par clé (création + polling + téléchargement)
+        self.per_key_concurrency = 4
+        self.key_semaphores = {key: threading.Semaphore(self.per_key_concurrency) for key in self.api_keys}
+        
+        # Débit maximal par clé (requêtes/s) pour ne pas déclencher les limites Freepik
+        self._key_limiters = {key: TokenBucket(rate=2.0, capacity=4) for key in self.api_keys}
+        
+        # Statistiques par clé pour monitoring (partagées entre les workers)
+        # Chaque thread incrémente son propre tampon (sans verrou); un thread de fond agrège
+        # périodiquement les tampons dans key_stats
         self.key_stats = {key: {"success": 0, "failed": 0} for key in self.api_keys}
+        self._stats_lock = threading.Lock()
+        self._stats_local = threading.local()
+        self._stats_buffers: List[Dict[Tuple[str, str], int]] = []
+        self.stats_flush_interval = 5.0
+        self._stats_stop = threading.Event()
+        self._stats_flusher = threading.Thread(target=self._stats_flush_loop, daemon=True)
+        self._stats_flusher.start()
+        
+        # Rotation des clés: distribution équitable en O(1), protégée pour les appels concurrents
+        self._key_rr = deque(self.api_keys)
+        self._key_lock = threading.Lock()
+        
+        # Une session HTTP par clé (en-tête d'authentification posé une fois): keep-alive et
+        # réutilisation des connexions TLS vers Freepik entre création, polling et retries
+        self.sessions = {key: self._create_session(api_key=key) for key in self.api_keys}
+        
+        # Session sans clé pour les téléchargements: les URLs d'images pointent hors de l'API
+        self.session = self._create_session()
         
         logger.info(f"Initialized with {len(self.api_keys)} API keys for simultaneous use")
     
+    def _create_session(self, api_key: Optional[str] = None) -> requests.Session:
+        """Session avec pool de connexions partagé par tous les threads de la clé"""
+        session = requests.Session()
+        # Seuls les échecs de connexion sont rejoués ici (la requête n'est pas partie, même un POST
+        # est sûr); les autres erreurs restent gérées par generate_image_with_key
+        session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.5)
+        ))
+        session.headers.update({"User-Agent": "Competition-Waste-Generator/1.0"})
+        if api_key:
+            session.headers.update({"x-freepik-api-key": api_key})
+        return session
+    
+    def close(self):
+        """Arrête l'agrégation des statistiques et ferme les sessions HTTP"""
+        self._stats_stop.set()
+        self._flush_stats()
+        for session in self.sessions.values():
+            session.close()
+        self.session.close()
+    
     def _load_api_keys(self) -> List[str]:
         """Charge toutes les clés API disponibles"""
         keys = []
@@ -117,17 +317,24 @@ class FreepikImageGenerator:
     
     def get_next_api_key(self) -> str:
         """Distribution équitable des clés pour utilisation simultanée"""
-        # Utiliser la clé avec le moins d'utilisations pour équilibrer la charge
-        return min(self.api_keys, key=lambda k: self.key_stats[k]["success"] + self.key_stats[k]["failed"])
+        # Round-robin: la clé suivante est attribuée dès l'appel, les tâches parallèles
+        # ne s'accumulent donc pas sur la même clé
+        with self._key_lock:
+            key = self._key_rr[0]
+            self._key_rr.rotate(-1)
+            return key
     
     def generate_image(self, waste_item: CompetitionWasteItem) -> Optional[bytes]:
         """Interface de compatibilité - utilise la première clé disponible"""
         return self.generate_image_with_key(waste_item, self.get_next_api_key())
     
-    def generate_image_with_key(self, waste_item: CompetitionWasteItem, assigned_key: str) -> Optional[bytes]:
-        """Génère une image avec une clé API spécifique assignée"""
+    def generate_image_with_key(self, waste_item: CompetitionWasteItem, assigned_key: str,
+                                prompt: Optional[str] = None) -> Optional[bytes]:
+        """Génère une image avec une clé API spécifique assignée (prompt: prompt déjà construit par l'appelant)"""
         try:
-            prompt = self._build_simple_prompt(waste_item)
+            if prompt is None:
+                prompt = self._build_simple_prompt(waste_item)
+            
             logger.info(f"[Key {assigned_key[:8]}...] Generating: {waste_item.name}")
             
             for attempt in range(self.max_retries + 1):
@@ -137,73 +344,54 @@ class FreepikImageGenerator:
                         time.sleep(delay)
                         logger.info(f"[Key {assigned_key[:8]}...] Retry {attempt} for {waste_item.name}")
                     
-                    image_data = self._generate_with_specific_key(prompt, assigned_key)
+                    # Limiter le nombre de tâches simultanées sur cette clé (le backoff reste hors verrou)
+                    with self.key_semaphores[assigned_key]:
+                        image_data = self._generate_with_specific_key(prompt, assigned_key)
                     if image_data:
-                        self.key_stats[assigned_key]["success"] += 1
+                        self._record_stat(assigned_key, "success")
                         logger.info(f"[Key {assigned_key[:8]}...] ✓ {waste_item.name}")
                         return image_data
                         
                 except Exception as e:
                     logger.warning(f"[Key {assigned_key[:8]}...] Attempt {attempt + 1} failed for {waste_item.name}: {e}")
                     if attempt == self.max_retries:
-                        self.key_stats[assigned_key]["failed"] += 1
+                        self._record_stat(assigned_key, "failed")
             
             logger.error(f"[Key {assigned_key[:8]}...] ✗ All attempts failed for {waste_item.name}")
             return None
             
         except Exception as e:
             logger.error(f"[Key {assigned_key[:8]}...] Exception for {waste_item.name}: {e}")
-            self.key_stats[assigned_key]["failed"] += 1
+            self._record_stat(assigned_key, "failed")
             return None
     
     def _build_simple_prompt(self, waste_item: CompetitionWasteItem) -> str:
         """CORRECTION: Prompt court et efficace"""
-        # Prompts courts et précis
-        base_descriptions = {
-            "menagers": "household garbage waste",
-            "recyclables": "recyclable waste material", 
-            "dangereux": "hazardous waste container"
-        }
-        
-        zone_context = {
-            "residentielle": "home",
-            "commerciale": "office", 
-            "industrielle": "factory"
-        }
-        
-        base = base_descriptions.get(waste_item.category, "waste")
-        context = zone_context.get(waste_item.zone, "")
-        
-        # Prompt final court
-        prompt = f"realistic {waste_item.name.replace('_', ' ')} {base} from {context}, used dirty refuse, white background"
-        
-        return prompt
+        return _build_prompt_cached(waste_item.name, waste_item.category, waste_item.zone)
+    
+    def request_digest(self, prompt: str) -> str:
+        """Empreinte de la requête complète (modèle, paramètres, prompt): changer l'un d'eux fait
+        manquer le cache au lieu de resservir une ancienne image"""
+        request = {**self._payload_template, "model": self.model, "prompt": prompt}
+        return hashlib.blake2b(orjson.dumps(request, option=orjson.OPT_SORT_KEYS), digest_size=8).hexdigest()
     
     def _generate_with_specific_key(self, prompt: str, api_key: str) -> Optional[bytes]:
         """Génère une image avec une clé API spécifique"""
-        headers = {
-            "x-freepik-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "prompt": prompt,
-            "aspect_ratio": "square_1_1",
-            "guidance_scale": 3.0,
-        }
+        payload = {**self._payload_template, "prompt": prompt}
         
         # Créer la tâche
-        response = requests.post(
-            f"{self.api_base_url}/seedream",
-            headers=headers,
-            json=payload,
+        self._key_limiters[api_key].acquire()
+        response = self.sessions[api_key].post(
+            f"{self.api_base_url}/{self.model}",
+            headers={"Content-Type": "application/json"},
+            data=orjson.dumps(payload),
             timeout=30
         )
         
         if response.status_code != 200:
             raise Exception(f"Task creation failed: {response.status_code}")
         
-        task_data = response.json()
+        task_data = orjson.loads(response.content)
         task_id = task_data.get("data", {}).get("task_id")
         
         if not task_id:
@@ -215,28 +403,82 @@ class FreepikImageGenerator:
             raise Exception("Image generation timeout")
         
         # Télécharger l'image
-        img_response = requests.get(image_url, timeout=60)
-        if img_response.status_code == 200:
-            return img_response.content
-        else:
-            raise Exception(f"Download failed: {img_response.status_code}")
+        return self._download_image(image_url)
+    
+    def _download_image(self, image_url: str) -> bytes:
+        """Télécharge l'image en streaming dans un tampon pré-alloué (une seule copie du corps)"""
+        with self.session.get(image_url, stream=True, timeout=60) as response:
+            if response.status_code != 200:
+                raise Exception(f"Download failed: {response.status_code}")
+            
+            size = int(response.headers.get("Content-Length") or 0)
+            buffer = bytearray(size)
+            offset = 0
+            pending = None
+            chunks = response.iter_content(chunk_size=65536)
+            
+            with memoryview(buffer) as view:
+                for chunk in chunks:
+                    end = offset + len(chunk)
+                    if end > size:
+                        # Content-Length absent ou inexact (corps compressé): on passe en mode extension
+                        pending = chunk
+                        break
+                    view[offset:end] = chunk
+                    offset = end
+            
+            del buffer[offset:]
+            if pending is not None:
+                buffer.extend(pending)
+                for chunk in chunks:
+                    buffer.extend(chunk)
+            
+            return bytes(buffer)
+    
+    def _record_stat(self, api_key: str, outcome: str):
+        """Incrémente un compteur dans le tampon du thread courant (seul ce thread y écrit)"""
+        buffer = getattr(self._stats_local, "buffer", None)
+        if buffer is None:
+            buffer = self._stats_local.buffer = {}
+            with self._stats_lock:
+                self._stats_buffers.append(buffer)
+        key = (api_key, outcome)
+        buffer[key] = buffer.get(key, 0) + 1
+    
+    def _flush_stats(self):
+        """Recalcule key_stats à partir des tampons (compteurs cumulés, jamais remis à zéro)"""
+        with self._stats_lock:
+            totals = {key: {"success": 0, "failed": 0} for key in self.api_keys}
+            for buffer in self._stats_buffers:
+                for (api_key, outcome), count in dict(buffer).items():
+                    totals[api_key][outcome] += count
+            self.key_stats = totals
+    
+    def _stats_flush_loop(self):
+        """Thread de fond: agrégation périodique des statistiques jusqu'à close()"""
+        while not self._stats_stop.wait(self.stats_flush_interval):
+            self._flush_stats()
     
     def get_statistics(self) -> Dict[str, Dict[str, int]]:
         """Retourne les statistiques d'utilisation par clé"""
-        return self.key_stats.copy()
+        self._flush_stats()
+        with self._stats_lock:
+            return {key: stats.copy() for key, stats in self.key_stats.items()}
     
     def _wait_for_completion(self, task_id: str, api_key: str, max_wait: int = 60) -> Optional[str]:
-        """Attend la completion de la tâche"""
-        headers = {"x-freepik-api-key": api_key}
-        check_url = f"{self.api_base_url}/seedream/{task_id}"
+        """Attend la completion de la tâche avec un intervalle de polling adaptatif"""
+        session = self.sessions[api_key]
+        check_url = f"{self.api_base_url}/{self.model}/{task_id}"
         
-        start_time = time.time()
+        deadline = time.monotonic() + max_wait
+        interval = self.poll_initial_interval
         
-        while time.time() - start_time < max_wait:
-            response = requests.get(check_url, headers=headers, timeout=30)
+        while time.monotonic() < deadline:
+            self._key_limiters[api_key].acquire()
+            response = session.get(check_url, timeout=30)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 task_data = data.get("data", {})
                 status = task_data.get("status")
                 
@@ -247,16 +489,115 @@ class FreepikImageGenerator:
                 elif status in ["FAILED", "CANCELLED"]:
                     return None
                 
-                time.sleep(3)
+                delay = interval
             else:
-                time.sleep(5)
+                delay = self.poll_max_interval
+            
+            # Respecter Retry-After si le serveur l'indique, sinon backoff progressif (1s -> 6s)
+            # avec un léger aléa pour désynchroniser les tâches lancées ensemble. L'attente ne dépasse
+            # jamais l'échéance: le worker (et son slot sur la clé) est libéré à max_wait
+            retry_after = self._parse_retry_after(response)
+            wait = retry_after if retry_after is not None else delay + random.uniform(0, self.poll_jitter)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(wait, remaining))
+            interval = min(interval * 1.5, self.poll_max_interval)
+        
+        return None
+    
+    @staticmethod
+    def _parse_retry_after(response: requests.Response) -> Optional[float]:
+        """Retourne le délai Retry-After en secondes, ou None s'il est absent/illisible"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+@contextmanager
+def _image_buffer(image_source: ImageSource):
+    """Donne accès au contenu d'une image: les fichiers du cache sont projetés en mémoire (mmap)
+    plutôt que lus, le cache de pages du système sert alors directement les octets"""
+    if isinstance(image_source, Path):
+        with open(image_source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Un fichier vide ne peut pas être projeté: ses octets (vides) sont rejetés au décodage
+                yield f.read()
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
+    else:
+        yield image_source
+
+def _process_image_high_quality(image_data, image_size_px: int, dpi: int) -> Optional[bytes]:
+    """CORRECTION: Traitement haute qualité pour éviter le flou (JPEG prêt pour le PDF)"""
+    from PIL import Image
+    
+    try:
+        # Ouvrir l'image source
+        if isinstance(image_data, mmap.mmap):
+            # Lecture directe dans la projection du fichier, sans copie intermédiaire
+            image_data.seek(0)
+            source_image = Image.open(image_data)
+        else:
+            source_image = Image.open(BytesIO(image_data))
+        
+        # CORRECTION: Redimensionnement haute qualité avec anti-aliasing
+        target_size = (image_size_px, image_size_px)
+        
+        # JPEG: demander au décodeur une réduction DCT (1/2, 1/4, 1/8) vers au moins 2x la cible
+        # avant tout accès aux pixels; sans effet pour les autres formats
+        source_image.draft("RGB", (image_size_px * 2, image_size_px * 2))
+        
+        # Convertir en RGB avant le redimensionnement (éviter les problèmes RGBA): le Lanczos
+        # ne traite alors que 3 canaux; les JPEG de Freepik sont déjà en RGB et passent tels quels
+        processed_image = source_image
+        if processed_image.mode in ("P", "PA", "LA") or "transparency" in processed_image.info:
+            # Palette / niveaux de gris avec transparence: passer par RGBA pour composer sur blanc
+            processed_image = processed_image.convert("RGBA")
+        if processed_image.mode == "RGBA":
+            background = Image.new("RGB", processed_image.size, (255, 255, 255))
+            background.paste(processed_image, mask=processed_image.getchannel("A"))
+            processed_image = background
+        elif processed_image.mode != "RGB":
+            processed_image = processed_image.convert("RGB")
+        
+        # Réduire à la taille d'impression 3x3 cm avant l'embarquement dans le PDF.
+        # Source carrée déjà proche de la cible (moins de 10% au-dessus): pas de rééchantillonnage.
+        # Sinon redimensionnement exact au carré: le PDF dessine les tuiles sans recalcul de ratio
+        width, height = processed_image.size
+        if width != height or width > image_size_px * 1.1:
+            processed_image = processed_image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        
+        # CORRECTION: Encoder en JPEG avec DPI explicite et haute qualité
+        output = BytesIO()
+        processed_image.save(
+            output, 
+            format='JPEG', 
+            quality=95,  # Haute qualité JPEG
+            dpi=(dpi, dpi),  # DPI explicite
+            optimize=True  # Tables de Huffman optimisées: sans perte, fichier plus petit
+        )
+        
+        logger.debug(f"Processed image: {target_size} at {dpi} DPI")
+        return output.getvalue()
         
+    except Exception as e:
+        logger.error(f"Error processing image: {e}")
         return None
 
+def _process_image_worker(image_source: ImageSource, image_size_px: int, dpi: int) -> Optional[bytes]:
+    """Point d'entrée des processus de traitement (fonction de module pour être sérialisable)"""
+    with _image_buffer(image_source) as image_data:
+        return _process_image_high_quality(image_data, image_size_px, dpi)
+
 class PDFLayoutGenerator:
     """Générateur de mise en page PDF pour les cubes de déchets - VERSION CORRIGÉE"""
     
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, cpu_pool: Optional[ProcessPoolExecutor] = None):
         self.output_dir = output_dir
         self.image_size_cm = 3.0
         
@@ -264,30 +605,131 @@ class PDFLayoutGenerator:
         self.dpi = 300
         self.image_size_px = int(self.image_size_cm * self.dpi / 2.54)  # Conversion cm vers pixels
         
+        # Imports PDF différés + préchargement des métriques de police
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.pdfbase import pdfmetrics
+        for font_name in PDF_FONTS:
+            pdfmetrics.getFont(font_name)
+        
         # Configuration PDF
         self.page_width, self.page_height = A4
         self.margin = 1 * cm
         self.spacing = 0.2 * cm
         self.images_per_row = 10
         
-        logger.info(f"PDF config: {self.image_size_px}px images, {self.dpi} DPI")
+        # Grille d'une page (constante pour tout le run): pour chaque ligne, les positions (x, y)
+        # des copies qui tiennent dans les marges
+        self.image_size_points = self.image_size_cm * cm
+        step = self.image_size_points + self.spacing
+        row_x_positions = [
+            self.margin + i * step
+            for i in range(self.images_per_row)
+            if self.margin + i * step + self.image_size_points <= self.page_width - self.margin
+        ]
+        row_y_positions = []
+        y = self.page_height - self.margin - self.image_size_points
+        while y >= self.margin + self.image_size_points:
+            row_y_positions.append(y)
+            y -= step
+        self._page_rows = [[(x, y) for x in row_x_positions] for y in row_y_positions]
+        
+        # Flux de pages compressés (zlib); les images JPEG restent embarquées telles quelles (DCTDecode)
+        self._canvas_kwargs = dict(pagesize=A4, pageCompression=1)
+        
+        # Images déjà traitées pour le PDF, indexées par empreinte du contenu source:
+        # un même blob n'est redimensionné qu'une fois, même s'il sert à plusieurs déchets
+        self._processed_by_digest: Dict[bytes, bytes] = {}
+        
+        # Redimensionnement + encodage JPEG (CPU) confiés à des processus pendant les téléchargements
+        self.cpu_pool = cpu_pool
+        self._pending: Dict[bytes, Future] = {}
     
-    def create_category_pdf(self, category: str, waste_images: List[Tuple[CompetitionWasteItem, bytes]]) -> str:
-        """Crée un PDF pour une catégorie de déchets"""
+    def prepare_image(self, waste_item: CompetitionWasteItem, image_source: ImageSource):
+        """Traite une image pour le PDF dès sa réception, en parallèle des téléchargements"""
+        with _image_buffer(image_source) as image_data:
+            digest = self._image_digest(image_data)
+            if digest in self._processed_by_digest or digest in self._pending:
+                return
+            if self.cpu_pool is None:
+                if self._get_processed_image(image_data, digest) is None:
+                    logger.warning(f"Failed to prepare image for {waste_item.name}")
+                return
+        
+        # Le résultat est récupéré au moment de dessiner la ligne dans le PDF
+        self._pending[digest] = self.cpu_pool.submit(
+            _process_image_worker, image_source, self.image_size_px, self.dpi
+        )
+    
+    @staticmethod
+    def _image_digest(image_data: bytes) -> bytes:
+        """Empreinte du contenu source d'une image (clé des caches de traitement et de formulaires)"""
+        return hashlib.blake2b(image_data, digest_size=16).digest()
+    
+    def _get_processed_image(self, image_data: bytes, digest: Optional[bytes] = None) -> Optional[BytesIO]:
+        """Retourne l'image traitée pour le PDF, en ne traitant qu'une fois chaque contenu distinct"""
+        if digest is None:
+            digest = self._image_digest(image_data)
+        processed = self._processed_by_digest.get(digest)
+        if processed is None:
+            future = self._pending.pop(digest, None)
+            if future is not None:
+                try:
+                    processed = future.result()
+                except Exception as e:
+                    logger.warning(f"Background image processing failed: {e}")
+            if processed is None:
+                processed = _process_image_high_quality(image_data, self.image_size_px, self.dpi)
+                if processed is None:
+                    return None
+            self._processed_by_digest[digest] = processed
+        return BytesIO(processed)
+    
+    def collect_processed_images(self, waste_images: List[Tuple[CompetitionWasteItem, ImageSource]]) -> Dict[bytes, bytes]:
+        """Images traitées (par empreinte) nécessaires à un PDF, pour le construire dans un autre processus"""
+        processed = {}
+        for waste_item, image_source in waste_images:
+            # Une image illisible est ignorée (elle sera signalée à la création du PDF), pas tout le lot
+            try:
+                with _image_buffer(image_source) as image_data:
+                    digest = self._image_digest(image_data)
+                    if self._get_processed_image(image_data, digest) is not None:
+                        processed[digest] = self._processed_by_digest[digest]
+            except (OSError, ValueError) as e:
+                logger.warning(f"Cannot read image for {waste_item.name}: {e}")
+        return processed
+    
+    def create_category_pdf(self, category: str, waste_images: List[Tuple[CompetitionWasteItem, ImageSource]],
+                            processed_images: Optional[Dict[bytes, bytes]] = None) -> str:
+        """Crée un PDF pour une catégorie de déchets (processed_images: images déjà traitées, par empreinte)"""
+        if processed_images:
+            self._processed_by_digest.update(processed_images)
         try:
             pdf_filename = f"competition_waste_{category}.pdf"
             pdf_path = self.output_dir / pdf_filename
+            tmp_path = pdf_path.with_suffix(".pdf.tmp")
             
-            c = canvas.Canvas(str(pdf_path), pagesize=A4)
-            
-            # Page de résumé
-            self._create_summary_page(c, category, waste_images)
-            c.showPage()
-            
-            # Pages d'images avec qualité corrigée
-            self._create_high_quality_images_pages(c, category, waste_images)
+            # Écriture dans un fichier temporaire ouvert une fois, puis remplacement atomique:
+            # un PDF interrompu ne remplace jamais la version précédente
+            try:
+                from reportlab.pdfgen import canvas
+                
+                with open(tmp_path, "wb") as fh:
+                    c = canvas.Canvas(fh, **self._canvas_kwargs)
+                    
+                    # Page de résumé
+                    self._create_summary_page(c, category, waste_images)
+                    c.showPage()
+                    
+                    # Pages d'images avec qualité corrigée (showPage à chaque page pleine)
+                    self._create_high_quality_images_pages(c, category, waste_images)
+                    
+                    c.save()
+                os.replace(tmp_path, pdf_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
             
-            c.save()
             logger.info(f"✓ PDF created: {pdf_path}")
             return str(pdf_path)
             
@@ -295,91 +737,75 @@ class PDFLayoutGenerator:
             logger.error(f"Error creating PDF for {category}: {e}")
             return None
     
-    def _create_high_quality_images_pages(self, c: canvas.Canvas, category: str, waste_images: List[Tuple[CompetitionWasteItem, bytes]]):
+    def _create_high_quality_images_pages(self, c: "canvas.Canvas", category: str, waste_images: List[Tuple[CompetitionWasteItem, ImageSource]]):
         """CORRECTION: Pages d'images haute qualité sans flou"""
+        from reportlab.lib.utils import ImageReader
+        from tqdm import tqdm
+        
         try:
-            image_size_points = self.image_size_cm * cm
-            row_height = image_size_points + self.spacing
+            image_size_points = self.image_size_points
+            row_index = 0
             
-            current_y = self.page_height - self.margin - image_size_points
+            # Formulaires déjà définis dans ce PDF, par empreinte d'image: un contenu identique
+            # sur plusieurs lignes réutilise le même XObject au lieu d'embarquer un nouveau flux
+            defined_forms = set()
             
-            for waste_item, image_data in tqdm(waste_images, desc=f"Adding {category} to PDF"):
-                # Nouvelle page si nécessaire
-                if current_y < self.margin + image_size_points:
-                    c.showPage()
-                    current_y = self.page_height - self.margin - image_size_points
-                
-                # CORRECTION: Traitement haute qualité de l'image
-                processed_image = self._process_image_high_quality(image_data)
-                if not processed_image:
-                    logger.warning(f"Failed to process image for {waste_item.name}")
+            for waste_item, image_source in tqdm(waste_images, desc=f"Adding {category} to PDF"):
+                try:
+                    with _image_buffer(image_source) as image_data:
+                        digest = self._image_digest(image_data)
+                        form_name = f"tile_{digest.hex()}"
+                        if form_name not in defined_forms:
+                            # CORRECTION: Traitement haute qualité de l'image (déjà fait si préparée pendant la génération)
+                            processed_image = self._get_processed_image(image_data, digest)
+                except (OSError, ValueError) as e:
+                    # Fichier du cache illisible: l'image est ignorée, le reste du PDF est produit
+                    logger.warning(f"Cannot read image for {waste_item.name}: {e}")
                     continue
                 
-                # Ajouter 10 images identiques sur la ligne
-                current_x = self.margin
-                for i in range(self.images_per_row):
-                    if current_x + image_size_points > self.page_width - self.margin:
-                        break
+                if form_name not in defined_forms:
+                    if not processed_image:
+                        logger.warning(f"Failed to process image for {waste_item.name}")
+                        continue
                     
-                    # CORRECTION: Utilisation correcte de drawImage avec BytesIO
+                    # Décoder l'image une seule fois et l'embarquer dans un Form XObject:
+                    # les 10 copies de la ligne ne sont que des références vers ce flux unique
+                    reader = ImageReader(processed_image)
+                    c.beginForm(form_name, upperx=image_size_points, uppery=image_size_points)
                     c.drawImage(
-                        processed_image,
-                        current_x,
-                        current_y,
+                        reader,
+                        0,
+                        0,
                         width=image_size_points,
                         height=image_size_points,
-                        preserveAspectRatio=True
+                        preserveAspectRatio=False,
+                        mask='auto'
                     )
-                    
-                    current_x += image_size_points + self.spacing
+                    c.endForm()
+                    defined_forms.add(form_name)
+                
+                # Nouvelle page si nécessaire
+                if row_index == len(self._page_rows):
+                    c.showPage()
+                    row_index = 0
+                
+                # Ajouter 10 images identiques sur la ligne
+                for x, y in self._page_rows[row_index]:
+                    c.saveState()
+                    c.translate(x, y)
+                    c.doForm(form_name)
+                    c.restoreState()
                 
-                current_y -= row_height
+                row_index += 1
                 
         except Exception as e:
             logger.error(f"Error creating image pages: {e}")
     
-    def _process_image_high_quality(self, image_data: bytes) -> Optional[BytesIO]:
-        """CORRECTION: Traitement haute qualité pour éviter le flou"""
-        try:
-            # Ouvrir l'image source
-            source_image = Image.open(BytesIO(image_data))
-            
-            # CORRECTION: Redimensionnement haute qualité avec anti-aliasing
-            target_size = (self.image_size_px, self.image_size_px)
-            
-            # Utiliser LANCZOS pour la meilleure qualité de redimensionnement
-            processed_image = source_image.resize(target_size, Image.Resampling.LANCZOS)
-            
-            # Convertir en RGB si nécessaire (éviter les problèmes RGBA)
-            if processed_image.mode in ("RGBA", "P"):
-                background = Image.new("RGB", processed_image.size, (255, 255, 255))
-                if processed_image.mode == "RGBA":
-                    background.paste(processed_image, mask=processed_image.split()[-1])
-                else:
-                    background.paste(processed_image)
-                processed_image = background
-            
-            # CORRECTION: Sauvegarder en BytesIO avec DPI explicite et haute qualité
-            output = BytesIO()
-            processed_image.save(
-                output, 
-                format='JPEG', 
-                quality=95,  # Haute qualité JPEG
-                dpi=(self.dpi, self.dpi),  # DPI explicite
-                optimize=False  # Pas d'optimisation qui pourrait dégrader
-            )
-            output.seek(0)
-            
-            logger.debug(f"Processed image: {target_size} at {self.dpi} DPI")
-            return output
-            
-        except Exception as e:
-            logger.error(f"Error processing image: {e}")
-            return None
-    
-    def _create_summary_page(self, c: canvas.Canvas, category: str, waste_images: List[Tuple[CompetitionWasteItem, bytes]]):
+    def _create_summary_page(self, c: "canvas.Canvas", category: str, waste_images: List[Tuple[CompetitionWasteItem, ImageSource]]):
         """Page de résumé simplifiée"""
-        page_width, page_height = A4
+        from reportlab.lib.units import cm
+        
+        page_width, page_height = self.page_width, self.page_height
         margin = 2 * cm
         
         # Titre
@@ -391,7 +817,6 @@ class PDFLayoutGenerator:
         
         # Statistiques
         y_pos = page_height - margin - 4*cm
-        c.setFont("Helvetica", 14)
         stats = [
             f"Total d'images: {len(waste_images)}",
             f"Format: 3x3 cm à {self.dpi} DPI",
@@ -403,25 +828,108 @@ class PDFLayoutGenerator:
             "3. Coller sur les cubes de compétition"
         ]
         
-        for stat in stats:
-            c.drawString(margin, y_pos, stat)
-            y_pos -= 0.7*cm
+        # Un seul bloc texte (BT/ET) pour toutes les lignes au lieu d'un drawString par ligne
+        text = c.beginText(margin, y_pos)
+        text.setFont("Helvetica", 14, leading=0.7*cm)
+        text.textLines(stats)
+        c.drawText(text)
+
+class LazyImageCache(Mapping):
+    """Cache d'images sur disque (un fichier .jpg brut par clé); donne le chemin, le contenu
+    n'est lu (mmap) qu'au moment du traitement pour le PDF"""
+    
+    def __init__(self, cache_dir: Path, keys):
+        self.cache_dir = cache_dir
+        self._keys = set(keys)
+    
+    def __getitem__(self, cache_key: str) -> Path:
+        if cache_key not in self._keys:
+            raise KeyError(cache_key)
+        path = self.cache_dir / f"{cache_key}.jpg"
+        # Fichier absent ou tronqué: considéré comme non caché, l'image sera régénérée
+        if not _is_complete_jpeg(path):
+            raise KeyError(cache_key)
+        return path
+    
+    def __contains__(self, cache_key) -> bool:
+        return cache_key in self._keys
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+# Générateur PDF d'un processus du pool: construit à la première catégorie traitée par ce processus
+# (imports reportlab, métriques de police, grille de page) puis réutilisé pour les suivantes
+_worker_pdf_generator: Optional[PDFLayoutGenerator] = None
+
+def _create_category_pdf_worker(output_dir: Path, category: str,
+                                waste_images: List[Tuple[CompetitionWasteItem, ImageSource]],
+                                processed_images: Dict[bytes, bytes]) -> Optional[str]:
+    """Construit le PDF d'une catégorie dans un processus du pool (fonction de module pour être sérialisable)"""
+    global _worker_pdf_generator
+    if _worker_pdf_generator is None or _worker_pdf_generator.output_dir != output_dir:
+        _worker_pdf_generator = PDFLayoutGenerator(output_dir)
+    return _worker_pdf_generator.create_category_pdf(category, waste_images, processed_images)
 
 class CompetitionDatasetGenerator:
     """Générateur principal du dataset pour la compétition - VERSION CORRIGÉE"""
     
-    def __init__(self, output_dir: str = "competition_waste_dataset"):
+    def __init__(self, output_dir: str = "competition_waste_dataset", use_cache: bool = True,
+                 seed: Optional[int] = None):
         self.output_dir = Path(output_dir)
+        self.use_cache = use_cache
+        
+        # Ordre de soumission mélangé (reproductible si seed est fourni)
+        self._rng = random.Random(seed)
         self.freepik_generator = FreepikImageGenerator()
-        self.pdf_generator = PDFLayoutGenerator(self.output_dir)
         
-        self.max_workers = 2  # Légèrement parallélisé
+        # Traitement des images pour le PDF (CPU) hors du GIL, en parallèle des appels API.
+        # Processus démarrés en "spawn": un fork lancé depuis un thread pendant que les autres
+        # (logging, tqdm, sessions HTTP, statistiques) tiennent un verrou hériterait de ce verrou
+        # et bloquerait le worker
+        self._cpu_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+        self.pdf_generator = PDFLayoutGenerator(self.output_dir, cpu_pool=self._cpu_pool)
+        logger.info(f"PDF config: {self.pdf_generator.image_size_px}px images, {self.pdf_generator.dpi} DPI")
+        
+        # Travail essentiellement réseau: autant de workers que de slots concurrents sur l'ensemble des clés,
+        # plafonné pour ne pas multiplier les threads avec beaucoup de clés
+        self.max_workers = min(32, len(self.freepik_generator.api_keys) * self.freepik_generator.per_key_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="wasteGen")
+        
+        # PDFs lancés pendant la génération, par catégorie (récupérés par generate_pdfs)
+        self._pdf_futures: Dict[str, Future] = {}
+        
+        # Stockage unique des images téléchargées, écrit dès la réception:
+        # cache/catégorie_zone_nom.<empreinte de la requête>.jpg
+        self.cache_dir = self.output_dir / "cache"
         
         self._setup_directories()
         
+        # Index du cache: fichier en ajout ouvert une fois, écritures sérialisées, fsync par lots
+        self._cache_lock = threading.Lock()
+        self._cache_index_fp = None
+        self._cache_unsynced = 0
+        self.cache_fsync_every = 8
+        
         # CORRECTION: Configuration corrigée pour 42 items par catégorie
         self.waste_items = self._load_corrected_waste_configuration()
         
+        # Prompts construits une fois pour tout le run (clé: catégorie_zone_nom), réutilisés à chaque retry
+        self.prompts = {
+            item.cache_key: self.freepik_generator._build_simple_prompt(item)
+            for item in self.waste_items
+        }
+        
+        # Nom du fichier de cache de chaque image: clé de l'item + empreinte de sa requête
+        self.cache_names = {
+            cache_key: f"{cache_key}.{self.freepik_generator.request_digest(prompt)}"
+            for cache_key, prompt in self.prompts.items()
+        }
+        
         logger.info(f"Initialized with {len(self.waste_items)} waste items")
         logger.info(f"Distribution: {self._count_by_category()}")
     
@@ -431,231 +939,101 @@ class CompetitionDatasetGenerator:
             self.output_dir,
             self.output_dir / "images", 
             self.output_dir / "pdfs",
-            self.output_dir / "cache"
+            self.cache_dir
         ]
         
         for directory in directories:
             directory.mkdir(parents=True, exist_ok=True)
     
     def _load_corrected_waste_configuration(self) -> List[CompetitionWasteItem]:
-        """CORRECTION: Configuration pour exactement 42 items par catégorie"""
-        
-        # 14 types de base par catégorie, répartis sur les 3 zones
-        waste_types = {
-            "menagers": [
-                # Zone résidentielle (14 items)
-                ("bouteille_plastique_eau", "residentielle", "Bouteille d'eau plastique domestique", ["transparent", "bleu"], ["PET"], ["bouteille"]),
-                ("sac_plastique_courses", "residentielle", "Sac plastique de supermarché", ["blanc", "noir"], ["LDPE"], ["sac"]),
-                ("canette_soda", "residentielle", "Canette de soda aluminium", ["rouge", "bleu"], ["aluminium"], ["cylindrique"]),
-                ("boite_cereales", "residentielle", "Boîte de céréales carton", ["coloré"], ["carton"], ["rectangulaire"]),
-                ("reste_fruit", "residentielle", "Reste de fruits organiques", ["variable"], ["organique"], ["épluchure"]),
-                ("journal_quotidien", "residentielle", "Journal quotidien papier", ["noir", "blanc"], ["papier"], ["pages"]),
-                ("pot_yaourt", "residentielle", "Pot de yaourt plastique", ["blanc"], ["polystyrène"], ["pot"]),
-                ("bouteille_lait", "residentielle", "Bouteille de lait plastique", ["blanc"], ["HDPE"], ["bouteille"]),
-                ("boite_conserve_tomate", "residentielle", "Boîte de conserve tomates", ["rouge"], ["fer blanc"], ["cylindrique"]),
-                ("sachet_chips", "residentielle", "Sachet de chips métallisé", ["argenté"], ["aluminium"], ["sachet"]),
-                ("gobelet_cafe", "residentielle", "Gobelet café carton", ["brun"], ["carton"], ["gobelet"]),
-                ("emballage_biscuit", "residentielle", "Emballage de biscuits plastique", ["coloré"], ["plastique"], ["sachet"]),
-                ("bouteille_huile", "residentielle", "Bouteille d'huile verre", ["vert"], ["verre"], ["bouteille"]),
-                ("barquette_viande", "residentielle", "Barquette viande polystyrène", ["blanc"], ["polystyrène"], ["barquette"]),
-                
-                # Zone commerciale (14 items)
-                ("gobelet_distributeur", "commerciale", "Gobelet distributeur plastique", ["blanc"], ["PS"], ["gobelet"]),
-                ("canette_cafe", "commerciale", "Canette café métallique", ["noir"], ["aluminium"], ["cylindrique"]),
-                ("emballage_sandwich", "commerciale", "Emballage sandwich carton", ["blanc"], ["carton"], ["triangulaire"]),
-                ("bouteille_eau_bureau", "commerciale", "Bouteille eau bureau plastique", ["transparent"], ["PET"], ["bouteille"]),
-                ("sachet_sucre", "commerciale", "Sachet sucre papier", ["blanc"], ["papier"], ["sachet"]),
-                ("barquette_salade", "commerciale", "Barquette salade plastique", ["transparent"], ["PET"], ["rectangulaire"]),
-                ("pot_sauce", "commerciale", "Pot sauce plastique", ["blanc"], ["PP"], ["pot"]),
-                ("canette_the", "commerciale", "Canette thé glacé", ["vert"], ["aluminium"], ["cylindrique"]),
-                ("emballage_croissant", "commerciale", "Emballage croissanterie", ["transparent"], ["plastique"], ["sachet"]),
-                ("bouteille_jus", "commerciale", "Bouteille jus de fruit", ["orange"], ["PET"], ["bouteille"]),
-                ("boite_pizza", "commerciale", "Boîte pizza carton", ["blanc"], ["carton ondulé"], ["carrée"]),
-                ("gobelet_glace", "commerciale", "Gobelet glace carton", ["coloré"], ["carton"], ["conique"]),
-                ("sachet_ketchup", "commerciale", "Sachet ketchup plastique", ["rouge"], ["plastique"], ["sachet"]),
-                ("bouteille_smoothie", "commerciale", "Bouteille smoothie plastique", ["coloré"], ["PET"], ["bouteille"]),
-                
-                # Zone industrielle (14 items)
-                ("bidon_eau_5L", "industrielle", "Bidon eau 5L industriel", ["bleu"], ["HDPE"], ["bidon"]),
-                ("sac_ciment", "industrielle", "Sac ciment papier kraft", ["brun"], ["papier kraft"], ["sac"]),
-                ("feuillard_acier", "industrielle", "Feuillard acier d'emballage", ["gris"], ["acier"], ["bande"]),
-                ("film_plastique_palette", "industrielle", "Film plastique palette", ["transparent"], ["LDPE"], ["film"]),
-                ("bidon_huile_moteur", "industrielle", "Bidon huile moteur plastique", ["noir"], ["HDPE"], ["bidon"]),
-                ("carton_ondule_grand", "industrielle", "Grand carton ondulé", ["brun"], ["carton ondulé"], ["plaque"]),
-                ("sangle_textile", "industrielle", "Sangle textile d'arrimage", ["coloré"], ["polyester"], ["sangle"]),
-                ("jerrycan_20L", "industrielle", "Jerrycan 20L plastique", ["rouge"], ["HDPE"], ["jerrycan"]),
-                ("palette_bois_cassee", "industrielle", "Palette bois cassée", ["brun"], ["bois"], ["palette"]),
-                ("big_bag_vide", "industrielle", "Big bag textile vide", ["blanc"], ["polypropylène"], ["sac"]),
-                ("tuyau_plastique", "industrielle", "Tuyau plastique souple", ["noir"], ["PVC"], ["tuyau"]),
-                ("caisse_plastique", "industrielle", "Caisse plastique industrielle", ["gris"], ["PP"], ["caisse"]),
-                ("fût_metal_200L", "industrielle", "Fût métallique 200L", ["bleu"], ["acier"], ["cylindrique"]),
-                ("rouleau_carton", "industrielle", "Rouleau carton d'emballage", ["brun"], ["carton"], ["cylindrique"])
-            ],
-            
-            "recyclables": [
-                # Zone résidentielle (14 items)
-                ("bouteille_verre_vin", "residentielle", "Bouteille vin verre propre", ["vert"], ["verre"], ["bouteille"]),
-                ("journal_propre", "residentielle", "Journal papier propre", ["blanc"], ["papier journal"], ["pile"]),
-                ("canette_alu_propre", "residentielle", "Canette aluminium propre", ["argenté"], ["aluminium"], ["cylindrique"]),
-                ("boite_carton_propre", "residentielle", "Boîte carton alimentaire propre", ["brun"], ["carton"], ["boîte"]),
-                ("bouteille_plastique_propre", "residentielle", "Bouteille plastique nettoyée", ["transparent"], ["PET"], ["bouteille"]),
-                ("bocal_verre_propre", "residentielle", "Bocal verre alimentaire propre", ["transparent"], ["verre"], ["bocal"]),
-                ("magazine_propre", "residentielle", "Magazine papier glacé", ["coloré"], ["papier glacé"], ["magazine"]),
-                ("boite_metal_propre", "residentielle", "Boîte métal conserve propre", ["argenté"], ["fer blanc"], ["cylindrique"]),
-                ("carton_lait_propre", "residentielle", "Carton lait tétrapack propre", ["blanc"], ["carton plastifié"], ["tétrapack"]),
-                ("vetement_coton", "residentielle", "Vêtement coton usagé", ["variable"], ["coton"], ["textile"]),
-                ("chaussure_cuir", "residentielle", "Chaussure cuir usagée", ["brun"], ["cuir"], ["chaussure"]),
-                ("livre_papier", "residentielle", "Livre papier usagé", ["variable"], ["papier"], ["livre"]),
-                ("sac_tissu", "residentielle", "Sac tissu réutilisable", ["variable"], ["tissu"], ["sac"]),
-                ("bouteille_verre_huile", "residentielle", "Bouteille huile verre propre", ["vert"], ["verre"], ["bouteille"]),
-                
-                # Zone commerciale (14 items)
-                ("papier_bureau_blanc", "commerciale", "Papier bureau blanc A4", ["blanc"], ["papier"], ["feuilles"]),
-                ("carton_emballage", "commerciale", "Carton emballage commercial", ["brun"], ["carton ondulé"], ["boîte"]),
-                ("canette_boisson_propre", "commerciale", "Canette boisson nettoyée", ["coloré"], ["aluminium"], ["cylindrique"]),
-                ("bouteille_eau_propre", "commerciale", "Bouteille eau PET propre", ["transparent"], ["PET"], ["bouteille"]),
-                ("verre_restaurant", "commerciale", "Verre restaurant cassé", ["transparent"], ["verre"], ["verre"]),
-                ("plastique_rigide_propre", "commerciale", "Plastique rigide PP propre", ["variable"], ["PP"], ["conteneur"]),
-                ("metal_canette_grande", "commerciale", "Grande canette métal 50cl", ["coloré"], ["aluminium"], ["cylindrique"]),
-                ("carton_pizza_propre", "commerciale", "Carton pizza sans graisse", ["blanc"], ["carton"], ["carré"]),
-                ("bouteille_verre_biere", "commerciale", "Bouteille bière verre brune", ["brun"], ["verre"], ["bouteille"]),
-                ("papier_journal_commercial", "commerciale", "Journaux distribution gratuite", ["coloré"], ["papier journal"], ["pile"]),
-                ("emballage_carton_sec", "commerciale", "Emballage carton sec", ["variable"], ["carton"], ["boîte"]),
-                ("plastique_transparent", "commerciale", "Plastique transparent PET", ["transparent"], ["PET"], ["conteneur"]),
-                ("metal_conserve_grande", "commerciale", "Grande conserve métal 1L", ["argenté"], ["fer blanc"], ["cylindrique"]),
-                ("verre_bocal_1L", "commerciale", "Bocal verre 1L commercial", ["transparent"], ["verre"], ["bocal"]),
-                
-                # Zone industrielle (14 items)
-                ("ferraille_acier", "industrielle", "Ferraille acier découpée", ["gris"], ["acier"], ["debris"]),
-                ("aluminium_industriel", "industrielle", "Aluminium industriel massif", ["argenté"], ["aluminium"], ["plaque"]),
-                ("cuivre_fil", "industrielle", "Fil cuivre électrique", ["cuivré"], ["cuivre"], ["bobine"]),
-                ("plastique_HDPE_industriel", "industrielle", "Plastique HDPE industriel", ["coloré"], ["HDPE"], ["bloc"]),
-                ("carton_ondule_industriel", "industrielle", "Carton ondulé industriel", ["brun"], ["carton ondulé"], ["plaque"]),
-                ("papier_kraft_industriel", "industrielle", "Papier kraft industriel", ["brun"], ["papier kraft"], ["rouleau"]),
-                ("metal_inox", "industrielle", "Acier inoxydable industriel", ["argenté"], ["inox"], ["plaque"]),
-                ("plastique_PP_industriel", "industrielle", "Polypropylène industriel", ["variable"], ["PP"], ["conteneur"]),
-                ("verre_industriel", "industrielle", "Verre industriel cassé", ["transparent"], ["verre"], ["debris"]),
-                ("bronze_industriel", "industrielle", "Bronze industriel usagé", ["bronze"], ["bronze"], ["pièce"]),
-                ("plastique_PVC_tuyau", "industrielle", "Tuyau PVC industriel", ["gris"], ["PVC"], ["tuyau"]),
-                ("carton_compacte", "industrielle", "Carton compacté industriel", ["brun"], ["carton"], ["balle"]),
-                ("metal_zinc", "industrielle", "Zinc industriel oxydé", ["gris"], ["zinc"], ["plaque"]),
-                ("plastique_PE_film", "industrielle", "Film PE industriel", ["transparent"], ["PE"], ["film"])
-            ],
-            
-            "dangereux": [
-                # Zone résidentielle (14 items) 
-                ("pile_alcaline", "residentielle", "Pile alcaline AA/AAA usée", ["noir"], ["alcaline"], ["cylindrique"]),
-                ("batterie_telephone", "residentielle", "Batterie téléphone lithium", ["noir"], ["lithium"], ["rectangulaire"]),
-                ("ampoule_led_cassee", "residentielle", "Ampoule LED cassée", ["blanc"], ["verre", "électronique"], ["ampoule"]),
-                ("tube_neon_casse", "residentielle", "Tube néon cassé mercure", ["blanc"], ["verre", "mercure"], ["tube"]),
-                ("medicament_expire", "residentielle", "Médicaments expirés", ["blanc", "coloré"], ["plastique"], ["boîte", "flacon"]),
-                ("produit_nettoyage_vide", "residentielle", "Produit nettoyage domestique vide", ["coloré"], ["plastique"], ["flacon"]),
-                ("peinture_pot_vide", "residentielle", "Pot peinture domestique vide", ["variable"], ["métal"], ["pot"]),
-                ("aerosol_vide", "residentielle", "Aérosol domestique vide", ["coloré"], ["métal"], ["cylindrique"]),
-                ("thermometre_mercure", "residentielle", "Thermomètre mercure cassé", ["argenté"], ["verre", "mercure"], ["tube"]),
-                ("pile_bouton", "residentielle", "Pile bouton lithium", ["argenté"], ["lithium"], ["ronde"]),
-                ("chargeur_telephone", "residentielle", "Chargeur téléphone défaillant", ["noir"], ["plastique", "métal"], ["câble"]),
-                ("produit_jardinage", "residentielle", "Produit jardinage toxique", ["coloré"], ["plastique"], ["bidon"]),
-                ("huile_vidange", "residentielle", "Huile vidange moteur domestique", ["noir"], ["plastique"], ["bidon"]),
-                ("solvant_bricolage", "residentielle", "Solvant bricolage domestique", ["variable"], ["métal"], ["bidon"]),
-                ("insecticide_aerosol", "residentielle", "Insecticide aérosol vide", ["coloré"], ["métal"], ["cylindrique"]),
-                ("dechets_electronique", "residentielle", "Déchets électroniques domestiques", ["noir"], ["plastique", "métal"], ["appareil"]),
-                ("produit_chimique_piscine", "residentielle", "Produit chimique piscine", ["bleu"], ["plastique"], ["bidon"]),
-                
-                # Zone commerciale (14 items)
-                ("cartouche_imprimante", "commerciale", "Cartouche imprimante usée", ["noir", "coloré"], ["plastique"], ["cartouche"]),
-                ("batterie_ordinateur", "commerciale", "Batterie ordinateur portable", ["noir"], ["lithium"], ["rectangulaire"]),
-                ("ecran_lcd_casse", "commerciale", "Écran LCD cassé", ["noir"], ["verre", "mercure"], ["plat"]),
-                ("produit_chimique_labo", "commerciale", "Produit chimique laboratoire", ["variable"], ["verre"], ["flacon"]),
-                ("huile_hydraulique", "commerciale", "Huile hydraulique usée", ["rouge"], ["plastique"], ["bidon"]),
-                ("batterie_vehicule_12V", "commerciale", "Batterie véhicule 12V", ["noir"], ["plomb", "acide"], ["rectangulaire"]),
-                ("liquide_refroidissement", "commerciale", "Liquide refroidissement auto", ["vert"], ["plastique"], ["bidon"]),
-                ("cartouche_toner", "commerciale", "Cartouche toner laser", ["noir"], ["plastique"], ["cylindrique"]),
-                ("produit_photographique", "commerciale", "Produit développement photo", ["brun"], ["plastique"], ["flacon"]),
-                ("disque_dur_defaillant", "commerciale", "Disque dur défaillant", ["gris"], ["métal"], ["rectangulaire"]),
-                ("condensateur_pcb", "commerciale", "Condensateur PCB usé", ["gris"], ["métal"], ["cylindrique"]),
-                ("liquide_frein", "commerciale", "Liquide frein automobile", ["jaune"], ["plastique"], ["flacon"]),
-                ("batterie_ups", "commerciale", "Batterie onduleur UPS", ["noir"], ["plomb"], ["rectangulaire"]),
-                ("produit_colle_industriel", "commerciale", "Colle industrielle époxy", ["variable"], ["métal"], ["tube"]),
-                
-                # Zone industrielle (14 items) - CORRECTION: exactement 14 pour avoir 42 total
-                ("dechet_chimique_fût", "industrielle", "Déchet chimique en fût", ["bleu"], ["métal"], ["fût"]),
-                ("dechet_medical_hopital", "industrielle", "Déchet médical hospitalier", ["rouge"], ["plastique"], ["conteneur"]),
-                ("amiante_plaque", "industrielle", "Plaque fibrociment amiante", ["gris"], ["fibrociment"], ["plaque"]),
-                ("dechet_radioactif_faible", "industrielle", "Déchet radioactif faible activité", ["jaune"], ["métal"], ["fût"]),
-                ("solvant_industriel", "industrielle", "Solvant industriel chloré", ["transparent"], ["métal"], ["bidon"]),
-                ("acide_industriel", "industrielle", "Acide industriel concentré", ["transparent"], ["plastique"], ["jerrycan"]),
-                ("mercure_industriel", "industrielle", "Mercure industriel contaminé", ["argenté"], ["métal"], ["flacon"]),
-                ("cyanure_industriel", "industrielle", "Résidu cyanure industriel", ["blanc"], ["plastique"], ["sac"]),
-                ("pcb_transformateur", "industrielle", "PCB transformateur électrique", ["noir"], ["métal"], ["cuve"]),
-                ("chrome_hexavalent", "industrielle", "Chrome hexavalent galvanoplastie", ["jaune"], ["plastique"], ["cuve"]),
-                ("formaldehyde_industriel", "industrielle", "Formaldéhyde industriel", ["transparent"], ["verre"], ["flacon"]),
-                ("pesticide_industriel", "industrielle", "Pesticide industriel concentré", ["coloré"], ["métal"], ["bidon"]),
-                ("plomb_batterie_industriel", "industrielle", "Batterie industrielle plomb", ["gris"], ["plomb"], ["rectangulaire"]),
-                ("dechet_pharmaceutique", "industrielle", "Déchet pharmaceutique industriel", ["variable"], ["verre"], ["flacon"])
-            ]
-        }
-        
-        # Aplatir la configuration en une seule liste
-        waste_items = []
-        for category, items_list in waste_types.items():
-            for name, zone, description, colors, materials, forms in items_list:
-                waste_items.append(CompetitionWasteItem(
-                    name=name,
-                    category=category, 
-                    zone=zone,
-                    description=description,
-                    colors=colors,
-                    materials=materials,
-                    typical_forms=forms
-                ))
+        """CORRECTION: Configuration pour exactement 42 items par catégorie (waste_items.json)"""
+        waste_items = [CompetitionWasteItem(**entry) for entry in _load_waste_items_data()]
         
         logger.info(f"Loaded configuration: {self._count_items_by_category(waste_items)}")
         return waste_items
     
     def _count_items_by_category(self, items: List[CompetitionWasteItem]) -> Dict[str, int]:
         """Compte les items par catégorie"""
-        counts = {"menagers": 0, "recyclables": 0, "dangereux": 0}
-        for item in items:
-            if item.category in counts:
-                counts[item.category] += 1
-        return counts
+        counts = Counter(item.category for item in items)
+        return {category: counts[category] for category in WASTE_CATEGORIES}
     
     def _count_by_category(self) -> Dict[str, int]:
         """Compte les éléments par catégorie"""
         return self._count_items_by_category(self.waste_items)
     
-    def generate_all_images(self) -> Dict[str, List[Tuple[CompetitionWasteItem, bytes]]]:
+    def generate_all_images(self) -> Dict[str, List[Tuple[CompetitionWasteItem, ImageSource]]]:
         """Génère toutes les images avec gestion de cache"""
+        from tqdm import tqdm
+        
         logger.info("Starting image generation...")
         
-        # Organiser par catégorie
-        images_by_category = {"menagers": [], "recyclables": [], "dangereux": []}
+        # Organiser par catégorie: listes pré-dimensionnées sur les effectifs connus, tronquées à la fin
+        expected_counts = self._count_by_category()
+        images_by_category = {category: [None] * count for category, count in expected_counts.items()}
+        filled = dict.fromkeys(expected_counts, 0)
         
-        # Charger le cache
-        cached_items = self._load_cache()
+        def add_image(item: CompetitionWasteItem, image_source: ImageSource):
+            index = filled[item.category]
+            images_by_category[item.category][index] = (item, image_source)
+            filled[item.category] = index + 1
         
-        # Séparer les éléments cachés et à générer
-        items_to_generate = []
-        for item in self.waste_items:
-            cache_key = f"{item.category}_{item.zone}_{item.name}"
-            if cache_key in cached_items:
-                logger.info(f"Using cached: {item.name}")
-                images_by_category[item.category].append((item, cached_items[cache_key]))
-            else:
-                items_to_generate.append(item)
+        # Dès qu'une catégorie est entièrement résolue (cache, succès ou échec), son PDF est lancé
+        # pendant que les autres catégories se téléchargent encore. La soumission est confiée au
+        # consommateur: il est le seul à toucher aux images en préparation, et la collecte des
+        # résultats n'attend pas le traitement des images de la catégorie
+        remaining = dict(expected_counts)
+        self._pdf_futures = {}
         
-        if not items_to_generate:
-            logger.info("All images cached!")
-            return images_by_category
+        def resolve(item: CompetitionWasteItem):
+            remaining[item.category] -= 1
+            if remaining[item.category] == 0 and filled[item.category]:
+                category = item.category
+                pdf_queue.put(("pdf", category, images_by_category[category][:filled[category]]))
         
-        logger.info(f"Generating {len(items_to_generate)} new images...")
+        # Producteur/consommateur: les images sont préparées pour le PDF pendant que les suivantes se téléchargent
+        pdf_queue = queue.Queue(maxsize=16)
+        consumer = threading.Thread(target=self._pdf_prepare_worker, args=(pdf_queue,), daemon=True)
+        consumer.start()
         
-        # Générer en parallèle limité
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        try:
+            # Charger le cache (ignoré avec --no-cache pour forcer la régénération)
+            cached_items = self._load_cache() if self.use_cache else {}
+            
+            # Séparer les éléments cachés et à générer
+            items_to_generate = []
+            for item in self.waste_items:
+                image_path = cached_items.get(self.cache_names[item.cache_key])
+                if image_path is None and self.use_cache:
+                    image_path = self._adopt_legacy_image(item)
+                if image_path is not None:
+                    logger.info(f"Using cached: {item.name}")
+                    add_image(item, image_path)
+                    pdf_queue.put(("image", item, image_path))
+                    resolve(item)
+                else:
+                    items_to_generate.append(item)
+            
+            if not items_to_generate:
+                logger.info("All images cached!")
+                return images_by_category
+            
+            logger.info(f"Generating {len(items_to_generate)} new images...")
+            
+            # Mélanger l'ordre catégorie/zone pour que les premières tâches en vol ne soient pas
+            # toutes du même type
+            self._rng.shuffle(items_to_generate)
+            
+            # Générer en parallèle limité: clés attribuées en round-robin dès la soumission,
+            # le sémaphore de chaque clé borne ensuite ses tâches en vol
+            api_keys = self.freepik_generator.api_keys
             future_to_item = {
-                executor.submit(self.freepik_generator.generate_image, item): item
-                for item in items_to_generate
+                self._pool.submit(
+                    self.freepik_generator.generate_image_with_key,
+                    item,
+                    api_keys[index % len(api_keys)],
+                    prompt=self.prompts[item.cache_key]
+                ): item
+                for index, item in enumerate(items_to_generate)
             }
             
             with tqdm(total=len(future_to_item), desc="Generating") as pbar:
@@ -664,84 +1042,184 @@ class CompetitionDatasetGenerator:
                     try:
                         image_data = future.result()
                         if image_data:
-                            images_by_category[item.category].append((item, image_data))
-                            self._save_to_cache(item, image_data)
+                            # Une fois sur disque, seule la Path circule: la mémoire ne garde pas les octets
+                            image_path = self._save_downloaded_image(item, image_data)
+                            image_source = image_path if image_path is not None else image_data
+                            add_image(item, image_source)
+                            pdf_queue.put(("image", item, image_source))
                             logger.info(f"✓ {item.name}")
                         else:
                             logger.error(f"✗ {item.name}")
                     except Exception as e:
                         logger.error(f"Exception {item.name}: {e}")
                     
+                    resolve(item)
                     pbar.update(1)
+            
+            return images_by_category
         
-        return images_by_category
+        finally:
+            for category, images in images_by_category.items():
+                del images[filled[category]:]
+            pdf_queue.put(None)
+            consumer.join()
     
-    def generate_pdfs(self, images_by_category: Dict[str, List[Tuple[CompetitionWasteItem, bytes]]]) -> List[str]:
+    def _pdf_prepare_worker(self, pdf_queue: "queue.Queue"):
+        """Consommateur: traite chaque image reçue pour le PDF (("image", item, source)) et lance le PDF
+        des catégories terminées (("pdf", catégorie, images)) jusqu'au signal de fin (None)"""
+        while True:
+            message = pdf_queue.get()
+            if message is None:
+                break
+            kind, *payload = message
+            if kind == "pdf":
+                # Toutes les images de la catégorie ont été reçues avant ce message (file FIFO)
+                category, waste_images = payload
+                try:
+                    self._pdf_futures[category] = self._submit_category_pdf(category, waste_images)
+                except Exception as e:
+                    # Le PDF sera relancé par generate_pdfs
+                    logger.warning(f"Failed to start PDF for {category}: {e}")
+                continue
+            item, image_source = payload
+            try:
+                self.pdf_generator.prepare_image(item, image_source)
+            except Exception as e:
+                # Le traitement sera retenté lors de la création du PDF
+                logger.warning(f"Failed to prepare {item.name} for PDF: {e}")
+    
+    def _submit_category_pdf(self, category: str, waste_images: List[Tuple[CompetitionWasteItem, ImageSource]]) -> Future:
+        """Lance la construction du PDF d'une catégorie dans le pool de processus"""
+        logger.info(f"Creating PDF: {category} ({len(waste_images)} items)")
+        processed_images = self.pdf_generator.collect_processed_images(waste_images)
+        return self._cpu_pool.submit(
+            _create_category_pdf_worker, self.output_dir, category, waste_images, processed_images
+        )
+    
+    def generate_pdfs(self, images_by_category: Dict[str, List[Tuple[CompetitionWasteItem, ImageSource]]]) -> List[str]:
         """Génère les PDFs pour chaque catégorie"""
         logger.info("Generating PDFs...")
         
-        pdf_paths = []
+        # Les PDFs sont indépendants: un processus par catégorie; ceux des catégories terminées
+        # pendant la génération sont déjà en cours
+        futures = []
         for category, waste_images in images_by_category.items():
             if waste_images:
-                logger.info(f"Creating PDF: {category} ({len(waste_images)} items)")
-                pdf_path = self.pdf_generator.create_category_pdf(category, waste_images)
-                if pdf_path:
-                    pdf_paths.append(pdf_path)
+                future = self._pdf_futures.pop(category, None)
+                if future is None:
+                    future = self._submit_category_pdf(category, waste_images)
+                futures.append(future)
             else:
                 logger.warning(f"No images for category: {category}")
         
+        pdf_paths = []
+        for future in futures:
+            try:
+                pdf_path = future.result()
+            except Exception as e:
+                logger.error(f"PDF worker failed: {e}")
+                continue
+            if pdf_path:
+                pdf_paths.append(pdf_path)
+        
         return pdf_paths
     
-    def _load_cache(self) -> Dict[str, bytes]:
-        """Charge le cache des images"""
-        cache_file = self.output_dir / "cache" / "image_cache.json"
-        cached_items = {}
+    def _load_cache(self) -> Mapping[str, Path]:
+        """Charge l'index du cache des images (fichiers lus à la demande)"""
+        cache_dir = self.cache_dir
+        index_file = cache_dir / "index.txt"
         
-        if cache_file.exists():
+        try:
+            # Ouverture directe: un seul appel système, l'absence se lit dans l'exception
             try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                
-                for key, base64_data in cache_data.items():
-                    try:
-                        cached_items[key] = base64.b64decode(base64_data)
-                    except Exception as e:
-                        logger.warning(f"Failed to decode cached image {key}: {e}")
-                
-                logger.info(f"Loaded {len(cached_items)} cached images")
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    keys = [line.strip() for line in f if line.strip()]
+            except FileNotFoundError:
+                # Premier passage: reconstruire l'index depuis les images déjà présentes
+                keys = [path.stem for path in cache_dir.glob("*.jpg")]
+                with open(index_file, 'w', encoding='utf-8') as f:
+                    f.writelines(f"{key}\n" for key in keys)
+        except Exception as e:
+            logger.warning(f"Failed to load cache: {e}")
+            keys = []
         
+        cached_items = LazyImageCache(cache_dir, keys)
+        logger.info(f"Loaded {len(cached_items)} cached images")
         return cached_items
     
-    def _save_to_cache(self, item: CompetitionWasteItem, image_data: bytes):
-        """Sauvegarde en cache"""
+    def _cache_path(self, item: CompetitionWasteItem) -> Path:
+        """Fichier de cache de l'image d'un item pour la requête courante"""
+        return self.cache_dir / f"{self.cache_names[item.cache_key]}.jpg"
+    
+    def _adopt_legacy_image(self, item: CompetitionWasteItem) -> Optional[Path]:
+        """Reprend l'image cache/<clé>.jpg d'une version précédente si la requête courante est celle
+        du code d'origine: elle est renommée sous sa clé complète et indexée, sans appel API"""
+        if not self.freepik_generator.uses_legacy_requests:
+            return None
+        legacy_path = self.cache_dir / f"{item.cache_key}.jpg"
+        if not _is_complete_jpeg(legacy_path):
+            return None
+        image_path = self._cache_path(item)
         try:
-            cache_dir = self.output_dir / "cache"
-            cache_file = cache_dir / "image_cache.json"
-            
-            # Charger cache existant
-            cache_data = {}
-            if cache_file.exists():
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-            
-            # Ajouter nouvelle image
-            cache_key = f"{item.category}_{item.zone}_{item.name}"
-            cache_data[cache_key] = base64.b64encode(image_data).decode('utf-8')
-            
-            # Sauvegarder
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f)
-            
-            # Image individuelle
-            image_file = cache_dir / f"{cache_key}.jpg"
-            with open(image_file, 'wb') as f:
-                f.write(image_data)
+            os.replace(legacy_path, image_path)
+        except OSError as e:
+            logger.warning(f"Failed to migrate cached image for {item.name}: {e}")
+            return None
+        self._save_to_cache(item)
+        return image_path
+    
+    def _save_downloaded_image(self, item: CompetitionWasteItem, image_data: bytes) -> Optional[Path]:
+        """Écrit l'image dans le cache dès sa réception (seule copie sur disque): un run
+        interrompu reprend sans appel API"""
+        image_path = self._cache_path(item)
+        try:
+            # Image déjà complète sur disque d'un run précédent: on ne la réécrit pas (sauf régénération
+            # forcée avec --no-cache, où la nouvelle image remplace l'ancienne). Un fichier tronqué
+            # par un run interrompu est remplacé, toujours de façon atomique
+            if not (self.use_cache and _is_complete_jpeg(image_path)):
+                _write_file_atomic(image_path, image_data)
+        except OSError as e:
+            logger.warning(f"Failed to save image for {item.name}: {e}")
+            return None
+        # Indexée aussitôt l'image en place: une image complète sur disque n'est jamais absente de
+        # l'index d'un run interrompu (sauf perte des dernières lignes non synchronisées sur panne)
+        self._save_to_cache(item)
+        return image_path
+    
+    def _save_to_cache(self, item: CompetitionWasteItem):
+        """Ajoute la clé d'une image enregistrée à l'index du cache (sans réécriture)"""
+        try:
+            # Index en ajout seul: coût constant par image, quelle que soit la taille du cache.
+            # Chaque ligne est poussée au système aussitôt (un run tué ne la perd pas), fsync par lots:
+            # un fsync toutes les cache_fsync_every images au plus dans la boucle de collecte
+            with self._cache_lock:
+                if self._cache_index_fp is None:
+                    self._cache_index_fp = open(self.cache_dir / "index.txt", 'a', encoding='utf-8')
+                self._cache_index_fp.write(f"{self.cache_names[item.cache_key]}\n")
+                self._cache_index_fp.flush()
+                self._cache_unsynced += 1
+                if self._cache_unsynced >= self.cache_fsync_every:
+                    self._sync_cache_index()
                 
         except Exception as e:
             logger.warning(f"Failed to save cache for {item.name}: {e}")
     
+    def _sync_cache_index(self):
+        """Pousse l'index du cache sur disque (appelé avec _cache_lock tenu)"""
+        self._cache_index_fp.flush()
+        os.fsync(self._cache_index_fp.fileno())
+        self._cache_unsynced = 0
+    
+    def _close_cache_index(self):
+        """Synchronise et ferme l'index du cache en fin de run"""
+        with self._cache_lock:
+            if self._cache_index_fp is not None:
+                try:
+                    self._sync_cache_index()
+                finally:
+                    self._cache_index_fp.close()
+                    self._cache_index_fp = None
+    
     def run_full_generation(self) -> Dict[str, any]:
         """Lance la génération complète"""
         start_time = time.time()
@@ -794,16 +1272,37 @@ class CompetitionDatasetGenerator:
                 "error": str(e),
                 "elapsed_time": time.time() - start_time
             }
+        
+        finally:
+            # Fin de run: index du cache complet et sur disque; pools et sessions restent ouverts
+            # pour un run suivant sur la même instance (libérés par close())
+            self._close_cache_index()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Libère les pools, l'index du cache et les sessions HTTP"""
+        self._pool.shutdown(wait=True)
+        self._close_cache_index()
+        self._cpu_pool.shutdown(cancel_futures=True)
+        self.freepik_generator.close()
 
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Générateur d'images de déchets pour compétition")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignorer le cache disque et régénérer toutes les images")
+    args = parser.parse_args()
+    
     try:
         # Vérifier les clés API
-        has_api_key = bool(os.getenv("FREEPIK_API_KEY"))
-        for i in range(1, 10):
-            if os.getenv(f"FREEPIK_API_KEY_{i}"):
-                has_api_key = True
-                break
+        has_api_key = bool(os.getenv("FREEPIK_API_KEY")) or any(
+            os.getenv(f"FREEPIK_API_KEY_{i}") for i in range(1, 10)
+        )
         
         if not has_api_key:
             logger.error("Aucune clé API Freepik trouvée!")
@@ -811,8 +1310,8 @@ def main():
             return
         
         # Lancer la génération
-        generator = CompetitionDatasetGenerator("competition_waste_dataset")
-        result = generator.run_full_generation()
+        with CompetitionDatasetGenerator("competition_waste_dataset", use_cache=not args.no_cache) as generator:
+            result = generator.run_full_generation()
         
         if result["success"]:
             print("\n" + "="*60)
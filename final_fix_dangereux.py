@@ -18,6 +18,8 @@ from tqdm import tqdm
 import time
 import random
 
+from freepik_polling import API_BASE_URL, create_session, wait_for_completion
+
 # Charger les clés API
 load_dotenv()
 
@@ -38,6 +40,9 @@ def load_api_keys():
 
 API_KEYS = load_api_keys()
 
+# Session HTTP partagée par toutes les requêtes du script (création, polling, téléchargement)
+SESSION = create_session()
+
 # Liste des 11 fichiers qui ont encore échoué
 REMAINING_FAILED_FILES = [
     "competition_waste_dataset/images/dangereux/commerciale/dangereux_commerciale_batterie_ordinateur.jpg",
@@ -73,8 +78,6 @@ def get_next_api_key(idx):
 
 def generate_image_with_freepik_api(prompt, api_key):
     """Version avec timeout encore plus long et gestion d'erreur améliorée"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    
     headers = {
         "x-freepik-api-key": api_key,
         "Content-Type": "application/json"
@@ -90,8 +93,8 @@ def generate_image_with_freepik_api(prompt, api_key):
         # Créer la tâche avec retry en cas d'erreur réseau
         for attempt in range(3):
             try:
-                response = requests.post(
-                    f"{api_base_url}/seedream",
+                response = SESSION.post(
+                    f"{API_BASE_URL}/seedream",
                     headers=headers,
                     json=payload,
                     timeout=45
@@ -112,14 +115,15 @@ def generate_image_with_freepik_api(prompt, api_key):
             raise Exception("No task_id received")
         
         # Attendre la completion avec timeout très long
-        image_url = wait_for_completion(task_id, api_key, max_wait=180)  # 3 minutes
+        image_url = wait_for_completion(SESSION, task_id, api_key, max_wait=180, poll_cap=8,
+                                        timeout=45, network_error_wait=10)  # 3 minutes
         if not image_url:
             raise Exception("Image generation timeout")
         
         # Télécharger l'image avec retry
         for attempt in range(3):
             try:
-                img_response = requests.get(image_url, timeout=90)
+                img_response = SESSION.get(image_url, timeout=90)
                 if img_response.status_code == 200:
                     return Image.open(BytesIO(img_response.content))
                 else:
@@ -133,39 +137,6 @@ def generate_image_with_freepik_api(prompt, api_key):
         logging.error(f"Erreur API Freepik : {e}")
         return None
 
-def wait_for_completion(task_id, api_key, max_wait=180):
-    """Version avec timeout très long et gestion d'erreur réseau"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    headers = {"x-freepik-api-key": api_key}
-    check_url = f"{api_base_url}/seedream/{task_id}"
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait:
-        try:
-            response = requests.get(check_url, headers=headers, timeout=45)
-            
-            if response.status_code == 200:
-                data = response.json()
-                task_data = data.get("data", {})
-                status = task_data.get("status")
-                
-                if status == "COMPLETED":
-                    generated_urls = task_data.get("generated", [])
-                    if len(generated_urls) >= 2 and str(generated_urls[1]).startswith("http"):
-                        return generated_urls[1]
-                elif status in ["FAILED", "CANCELLED"]:
-                    return None
-                
-                time.sleep(8)  # Attendre encore plus longtemps
-            else:
-                time.sleep(8)
-        except requests.exceptions.RequestException:
-            # En cas d'erreur réseau, attendre et continuer
-            time.sleep(10)
-    
-    return None
-
 def main():
     logging.basicConfig(level=logging.INFO)
     
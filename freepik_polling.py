@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Accès HTTP à l'API Freepik partagé par les scripts de correction des images dangereuses
+(regenerate_dangereux_images.py, retry_failed_dangereux.py, final_fix_dangereux.py).
+
+Auteur : Assistant IA
+Date : 20 septembre 2025
+"""
+
+import time
+
+import requests
+
+API_BASE_URL = "https://api.freepik.com/v1/ai/text-to-image"
+
+
+def create_session():
+    """Session unique pour la création des tâches, le polling et le téléchargement (keep-alive).
+    La clé API est passée à chaque appel à l'API: elle n'est pas envoyée à l'hôte des images."""
+    return requests.Session()
+
+
+def wait_for_completion(session, task_id, api_key, max_wait, poll_cap, timeout=30, network_error_wait=None):
+    """Attend la completion de la tâche et retourne l'URL de l'image (None si échec ou délai dépassé).
+
+    Après un statut non terminal, l'attente démarre à 1s et croît de x1.5 jusqu'à poll_cap; après une
+    réponse d'erreur, poll_cap complet. Avec network_error_wait, une erreur réseau est suivie de cette
+    attente au lieu d'être propagée.
+    """
+    check_url = f"{API_BASE_URL}/seedream/{task_id}"
+    headers = {"x-freepik-api-key": api_key}
+    delay = 1.0
+    start_time = time.time()
+
+    while time.time() - start_time < max_wait:
+        try:
+            response = session.get(check_url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if network_error_wait is None:
+                raise
+            time.sleep(network_error_wait)
+            continue
+
+        if response.status_code == 200:
+            data = response.json()
+            task_data = data.get("data", {})
+            status = task_data.get("status")
+
+            if status == "COMPLETED":
+                generated_urls = task_data.get("generated", [])
+                if len(generated_urls) >= 2 and str(generated_urls[1]).startswith("http"):
+                    return generated_urls[1]
+            elif status in ["FAILED", "CANCELLED"]:
+                return None
+
+            time.sleep(min(delay, poll_cap))
+            delay *= 1.5
+        else:
+            time.sleep(poll_cap)
+
+    return None
@@ -202,16 +202,23 @@ class CategoryPDFGenerator:
         
         images_by_category = defaultdict(lambda: defaultdict(list))
         
-        for category_dir in self.images_dir.iterdir():
-            if category_dir.is_dir() and category_dir.name in self.category_names:
-                category = category_dir.name
+        # os.scandir réutilise le type fourni par readdir : pas de stat par entrée,
+        # et un Path n'est construit que pour les images retenues
+        with os.scandir(self.images_dir) as category_entries:
+            for category_entry in category_entries:
+                if not (category_entry.is_dir() and category_entry.name in self.category_names):
+                    continue
+                category = category_entry.name
                 logger.info(f"Traitement de la catégorie: {category}")
                 
-                for zone_dir in category_dir.iterdir():
-                    if zone_dir.is_dir():
-                        zone = zone_dir.name
-                        image_files = [f for f in zone_dir.iterdir() 
-                                     if f.suffix.lower() in ['.jpg', '.jpeg', '.png']]
+                with os.scandir(category_entry.path) as zone_entries:
+                    for zone_entry in zone_entries:
+                        if not zone_entry.is_dir():
+                            continue
+                        zone = zone_entry.name
+                        with os.scandir(zone_entry.path) as file_entries:
+                            image_files = [Path(f.path) for f in file_entries
+                                           if f.name.lower().endswith(('.jpg', '.jpeg', '.png'))]
                         images_by_category[category][zone].extend(image_files)
                         logger.info(f"  Zone {zone}: {len(image_files)} images")
         
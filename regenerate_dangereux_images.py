@@ -15,13 +15,14 @@ import os
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
-import requests
 from PIL import Image
 from io import BytesIO
 from tqdm import tqdm
 import time
 import random
 
+from freepik_polling import API_BASE_URL, create_session, wait_for_completion
+
 # Charger les clés API
 load_dotenv()
 
@@ -43,6 +44,9 @@ def load_api_keys():
 
 API_KEYS = load_api_keys()
 
+# Session HTTP partagée par toutes les requêtes du script (création, polling, téléchargement)
+SESSION = create_session()
+
 DANGEROUS_DIR = Path("competition_waste_dataset/images/dangereux")
 
 PROMPT_TEMPLATE = (
@@ -67,8 +71,6 @@ def get_next_api_key(idx):
 
 def generate_image_with_freepik_api(prompt, api_key):
     """Génère une image en utilisant la même API que le générateur principal"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    
     headers = {
         "x-freepik-api-key": api_key,
         "Content-Type": "application/json"
@@ -82,8 +84,8 @@ def generate_image_with_freepik_api(prompt, api_key):
     
     try:
         # Créer la tâche
-        response = requests.post(
-            f"{api_base_url}/seedream",
+        response = SESSION.post(
+            f"{API_BASE_URL}/seedream",
             headers=headers,
             json=payload,
             timeout=30
@@ -99,12 +101,12 @@ def generate_image_with_freepik_api(prompt, api_key):
             raise Exception("No task_id received")
         
         # Attendre la completion
-        image_url = wait_for_completion(task_id, api_key)
+        image_url = wait_for_completion(SESSION, task_id, api_key, max_wait=60, poll_cap=3)
         if not image_url:
             raise Exception("Image generation timeout")
         
         # Télécharger l'image
-        img_response = requests.get(image_url, timeout=60)
+        img_response = SESSION.get(image_url, timeout=60)
         if img_response.status_code == 200:
             return Image.open(BytesIO(img_response.content))
         else:
@@ -115,36 +117,6 @@ def generate_image_with_freepik_api(prompt, api_key):
         return None
 
 
-def wait_for_completion(task_id, api_key, max_wait=60):
-    """Attend la completion de la tâche"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    headers = {"x-freepik-api-key": api_key}
-    check_url = f"{api_base_url}/seedream/{task_id}"
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait:
-        response = requests.get(check_url, headers=headers, timeout=30)
-        
-        if response.status_code == 200:
-            data = response.json()
-            task_data = data.get("data", {})
-            status = task_data.get("status")
-            
-            if status == "COMPLETED":
-                generated_urls = task_data.get("generated", [])
-                if len(generated_urls) >= 2 and str(generated_urls[1]).startswith("http"):
-                    return generated_urls[1]
-            elif status in ["FAILED", "CANCELLED"]:
-                return None
-            
-            time.sleep(3)
-        else:
-            time.sleep(3)
-    
-    return None
-
-
 def main():
     logging.basicConfig(level=logging.INFO)
     
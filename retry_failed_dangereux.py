@@ -10,13 +10,14 @@ import os
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
-import requests
 from PIL import Image
 from io import BytesIO
 from tqdm import tqdm
 import time
 import random
 
+from freepik_polling import API_BASE_URL, create_session, wait_for_completion
+
 # Charger les clés API
 load_dotenv()
 
@@ -37,6 +38,9 @@ def load_api_keys():
 
 API_KEYS = load_api_keys()
 
+# Session HTTP partagée par toutes les requêtes du script (création, polling, téléchargement)
+SESSION = create_session()
+
 # Liste des fichiers qui ont échoué
 FAILED_FILES = [
     "competition_waste_dataset/images/dangereux/commerciale/dangereux_commerciale_batterie_vehicule_12V.jpg",
@@ -73,8 +77,6 @@ def get_next_api_key(idx):
 
 def generate_image_with_freepik_api(prompt, api_key):
     """Génère une image en utilisant la même API que le générateur principal"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    
     headers = {
         "x-freepik-api-key": api_key,
         "Content-Type": "application/json"
@@ -88,8 +90,8 @@ def generate_image_with_freepik_api(prompt, api_key):
     
     try:
         # Créer la tâche
-        response = requests.post(
-            f"{api_base_url}/seedream",
+        response = SESSION.post(
+            f"{API_BASE_URL}/seedream",
             headers=headers,
             json=payload,
             timeout=30
@@ -105,12 +107,12 @@ def generate_image_with_freepik_api(prompt, api_key):
             raise Exception("No task_id received")
         
         # Attendre la completion avec timeout plus long
-        image_url = wait_for_completion(task_id, api_key, max_wait=120)  # 2 minutes
+        image_url = wait_for_completion(SESSION, task_id, api_key, max_wait=120, poll_cap=5)  # 2 minutes
         if not image_url:
             raise Exception("Image generation timeout")
         
         # Télécharger l'image
-        img_response = requests.get(image_url, timeout=60)
+        img_response = SESSION.get(image_url, timeout=60)
         if img_response.status_code == 200:
             return Image.open(BytesIO(img_response.content))
         else:
@@ -120,35 +122,6 @@ def generate_image_with_freepik_api(prompt, api_key):
         logging.error(f"Erreur API Freepik : {e}")
         return None
 
-def wait_for_completion(task_id, api_key, max_wait=120):
-    """Attend la completion de la tâche avec timeout plus long"""
-    api_base_url = "https://api.freepik.com/v1/ai/text-to-image"
-    headers = {"x-freepik-api-key": api_key}
-    check_url = f"{api_base_url}/seedream/{task_id}"
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait:
-        response = requests.get(check_url, headers=headers, timeout=30)
-        
-        if response.status_code == 200:
-            data = response.json()
-            task_data = data.get("data", {})
-            status = task_data.get("status")
-            
-            if status == "COMPLETED":
-                generated_urls = task_data.get("generated", [])
-                if len(generated_urls) >= 2 and str(generated_urls[1]).startswith("http"):
-                    return generated_urls[1]
-            elif status in ["FAILED", "CANCELLED"]:
-                return None
-            
-            time.sleep(5)  # Attendre plus longtemps entre les vérifications
-        else:
-            time.sleep(5)
-    
-    return None
-
 def main():
     logging.basicConfig(level=logging.INFO)
     